@@ -8,7 +8,7 @@ what?:
 
 import io, discord
 from discord import app_commands
-from .storage import fetch_recent_user_scores, upsert_policy, get_threshold
+from .storage import fetch_recent_user_scores, upsert_policy, get_thresholds
 from .utils import csv_export
 from .labels import LABELS
 from .policy import DEFAULTS
@@ -39,7 +39,8 @@ NICE = {
 
 
 def _embed_thr(gid: str, cid: str, title: str = "Toxicity policy") -> discord.Embed:
-    vals = {lab: (get_threshold(gid, cid, lab) or DEFAULTS.get(lab, 0.5)) for lab in LABELS}
+    overrides = get_thresholds(gid, cid)
+    vals = {lab: (overrides.get(lab) or DEFAULTS.get(lab, 0.5)) for lab in LABELS}
     e = discord.Embed(title=title, color=0x3B82F6)
     for k in LABELS:
         e.add_field(name=NICE.get(k, k), value=f"{vals[k]:.2f}", inline=True)
@@ -8,6 +8,7 @@ class Settings:
     token: str
     triage_channel_id: int | None
     retention_days: int
+    score_workers: int
 
 def _to_int(x):
     try: return int(x) if x else None
@@ -16,5 +17,6 @@ def _to_int(x):
 SETTINGS = Settings(
     token=os.getenv("DISCORD_TOKEN",""),
     triage_channel_id=_to_int(os.getenv("TRIAGE_CHANNEL_ID")),
-    retention_days=int(os.getenv("RETENTION_DAYS","30"))
+    retention_days=int(os.getenv("RETENTION_DAYS","30")),
+    score_workers=int(os.getenv("SCORE_WORKERS","2"))
 )
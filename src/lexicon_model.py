@@ -10,13 +10,32 @@ why?:
 """
 
 
-import json, os, re
-from typing import Dict, List, Tuple, Set
+import json, os, re, threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple, Set
+
+try:  # optional: C JSON parser, noticeably faster on big lexicons
+    import orjson
+except ImportError:
+    orjson = None
 
 # Always-flag these categories on any match
 ALWAYS_FLAG_CATS: Set[str] = {"PS","DDP","DDF","CDS","ASM","ASF"}
 
-_WORD_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+# Bit i <-> CATEGORIES[i] (the KNOWN codes of build_hurtlex_model)
+CATEGORIES: Tuple[str, ...] = ("PS","RCI","PA","DDF","DDP","DMC","IS","OR","AN","ASM","ASF","PR","OM","QAS","CDS","RE","SVP")
+CAT_INDEX: Dict[str, int] = {c: i for i, c in enumerate(CATEGORIES)}
+CAT_BIT: Dict[str, int] = {c: 1 << i for c, i in CAT_INDEX.items()}
+
+def cat_mask(cats: Iterable[str]) -> int:
+    m = 0
+    for c in cats:
+        m |= CAT_BIT.get(c, 0)
+    return m
+
+ALWAYS_FLAG_MASK = cat_mask(ALWAYS_FLAG_CATS)
+
+_WORD_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?", re.ASCII)
 
 def _norm(text: str) -> str:
     return (text or "").lower()
@@ -24,83 +43,229 @@ def _norm(text: str) -> str:
 def _tokens(text: str) -> List[str]:
     return _WORD_RE.findall(_norm(text))
 
-def _simple_lemmas(tok: str) -> List[str]:
-    """Very small inflection set: s/es, ies->y, ed, ing, er, est."""
-    t = tok.lower()
-    out = {t}
-    if len(t) > 3 and t.endswith("ies"):
-        out.add(t[:-3] + "y")
-    for suf in ("s","es","ed","ing","er","est"):
-        if len(t) > len(suf)+1 and t.endswith(suf):
-            out.add(t[:-len(suf)])
-    return list(out)
+def _inflections(word: str) -> List[str]:
+    """Very small inflection set: s/es, ies->y, ed, ing, er, est (forms, not lemmas)."""
+    w = word.lower()
+    out = [w]
+    if len(w) > 1:
+        out += [w + suf for suf in ("s","es","ed","ing","er","est")]
+        if w.endswith("y"):
+            out.append(w[:-1] + "ies")
+    return out
+
+def phrase_tokens(term: str) -> Tuple[str, ...]:
+    return tuple(t for t in re.split(r"[\s\-]+", term) if t)
+
+def build_automaton(phrase_map: Dict[Tuple[str, ...], List[str]]) -> Tuple[List[Dict[str, int]], List[int], List[List[str]]]:
+    """
+    Token-level Aho-Corasick automaton over the phrases: match() then walks
+    the message once, one transition per token, whatever the phrase count.
+    State 0 is the root; out[s] lists every phrase term ending in state s.
+    Plain lists/dicts so build_hurtlex_model can store it in the model JSON.
+    """
+    goto: List[Dict[str, int]] = [{}]
+    fail: List[int] = [0]
+    out: List[List[str]] = [[]]
+    for ptoks, terms in phrase_map.items():
+        if len(ptoks) < 2:
+            continue  # single-token phrases never matched as phrases
+        s = 0
+        for tok in ptoks:
+            nxt = goto[s].get(tok)
+            if nxt is None:
+                nxt = len(goto)
+                goto[s][tok] = nxt
+                goto.append({}); fail.append(0); out.append([])
+            s = nxt
+        out[s] += terms
+
+    # breadth-first so every fail target is final before it is inherited
+    queue = deque(goto[0].values())
+    while queue:
+        s = queue.popleft()
+        for tok, nxt in goto[s].items():
+            queue.append(nxt)
+            f = fail[s]
+            while f and tok not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f].get(tok, 0)
+            out[nxt] += out[fail[nxt]]
+    return goto, fail, out
 
 class Lexicon:
     def __init__(self, path: str):
         if not os.path.isfile(path):
             raise FileNotFoundError(f"Lexicon not found: {path}")
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson else json.loads(raw.decode("utf-8"))
 
         # Our builder writes: {"weights": {term: weight}, "categories": {term: [CATS...]}}
         self.weights: Dict[str, float] = {k.lower(): float(v) for k, v in data.get("weights", {}).items()}
         self.categories: Dict[str, List[str]] = {k.lower(): [c.upper() for c in v] for k, v in data.get("categories", {}).items()}
 
-        # Split phrases vs single words
-        self.phrases: List[Tuple[List[str], str]] = []
+        # Split phrases vs single words; phrase_map groups phrase terms by their
+        # token tuple ("ass-rape" and "ass rape" share one entry)
+        self.phrase_map: Dict[Tuple[str, ...], List[str]] = {}
         self.words: Set[str] = set()
-        self.max_phrase_len = 1
         for term in self.weights.keys():
             if " " in term or "-" in term:
-                toks = [t for t in re.split(r"[\s\-]+", term) if t]
+                toks = phrase_tokens(term)
                 if toks:
-                    self.phrases.append((toks, term))
-                    self.max_phrase_len = max(self.max_phrase_len, len(toks))
+                    self.phrase_map.setdefault(toks, []).append(term)
             else:
                 self.words.add(term)
 
+        # Inflected form -> base words, so a token needs a single dict lookup
+        self.word_forms: Dict[str, Tuple[str, ...]] = {}
+        for term in self.words:
+            for form in _inflections(term):
+                bases = self.word_forms.get(form, ())
+                if term not in bases:
+                    self.word_forms[form] = bases + (term,)
+
+        # Shortest text that could produce any hit (untokenizable terms excluded)
+        lens = [len(w) for w in self.words if _WORD_RE.fullmatch(w)]
+        lens += [len(" ".join(t)) for t in self.phrase_map if len(t) > 1]
+        self.min_term_len = min(lens, default=0)
+
+        # Hit record per term, built once and shared by every match() (read-only)
+        self._records: Dict[str, Dict] = {
+            term: {
+                "categories": self.categories.get(term, []),
+                "weight": self.weights[term],
+                "kind": "word" if term in self.words else "phrase",
+            }
+            for term in self.weights
+        }
+        # Category slots: CATEGORIES first (so CAT_BIT masks apply), then any other
+        # codes a custom lexicon uses, so sums and summarize() still cover them
+        extra = sorted({c for rec in self._records.values() for c in rec["categories"]} - set(CATEGORIES))
+        self.cat_order: Tuple[str, ...] = CATEGORIES + tuple(extra)
+        slot = {c: i for i, c in enumerate(self.cat_order)}
+        self._cat_idx: Dict[str, Tuple[int, ...]] = {
+            term: tuple(slot[c] for c in rec["categories"]) for term, rec in self._records.items()
+        }
+        self._masks: Dict[str, int] = {}
+        for term, idx in self._cat_idx.items():
+            m = 0
+            for i in idx:
+                m |= 1 << i
+            self._masks[term] = m
+        # v4 models ship the automaton prebuilt; older files, or a v4 file whose
+        # weights were edited after the build, get it built here
+        auto = data.get("automaton")
+        if auto and self._automaton_fits(auto):
+            self._goto, self._fail, self._out = auto["goto"], auto["fail"], auto["out"]
+        else:
+            self._goto, self._fail, self._out = build_automaton(self.phrase_map)
+
+    def _automaton_fits(self, auto: Dict) -> bool:
+        """True if a stored automaton covers exactly this lexicon's phrases."""
+        try:
+            goto, fail, out = auto["goto"], auto["fail"], auto["out"]
+            n = len(goto)
+            if not n == len(fail) == len(out):
+                return False
+            if any(not 0 <= v < n for v in fail) or any(not 0 <= v < n for g in goto for v in g.values()):
+                return False
+            if any(term not in self._records for terms in out for term in terms):
+                return False  # phrase removed from weights: match() would KeyError
+            for ptoks, terms in self.phrase_map.items():
+                if len(ptoks) < 2:
+                    continue
+                s = 0
+                for tok in ptoks:
+                    s = goto[s].get(tok)
+                    if s is None:
+                        return False  # phrase added to weights: never matched
+                if not set(terms) <= set(out[s]):
+                    return False
+            return True
+        except (KeyError, IndexError, TypeError, AttributeError):
+            return False
+
     def match(self, text: str) -> Dict[str, Dict]:
         """
         Returns {term: {categories: [...], weight: float, kind: 'phrase'|'word'}}
         Only matches exact words/phrases (with simple inflection backoff).
         """
         hits: Dict[str, Dict] = {}
-        toks = _tokens(text)
-        L = len(toks)
-
-        # phrase-first greedy sliding window
-        if self.max_phrase_len > 1 and L:
-            for start in range(L):
-                for plen in range(min(self.max_phrase_len, L - start), 1, -1):
-                    window = toks[start:start+plen]
-                    for ptoks, term in self.phrases:
-                        if window == ptoks:
-                            hits[term] = {
-                                "categories": self.categories.get(term, []),
-                                "weight": self.weights.get(term, 1.0),
-                                "kind": "phrase",
-                            }
-
-        # single-token lemmas with simple inflections
-        for tok in toks:
-            for lemma in _simple_lemmas(tok):
-                if lemma in self.words and lemma not in hits:
-                    hits[lemma] = {
-                        "categories": self.categories.get(lemma, []),
-                        "weight": self.weights.get(lemma, 1.0),
-                        "kind": "word",
-                    }
+        goto, fail, out, forms, records = self._goto, self._fail, self._out, self.word_forms, self._records
+
+        # one pass: advance the phrase automaton and resolve the token as a word
+        s = 0
+        for tok in _tokens(text):
+            while s and tok not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(tok, 0)
+            for term in out[s]:
+                hits[term] = records[term]
+            for lemma in forms.get(tok, ()):
+                if lemma not in hits:
+                    hits[lemma] = records[lemma]
         return hits
 
     def summarize(self, hits: Dict[str, Dict]) -> Dict[str, float]:
-        per_cat: Dict[str, float] = {}
-        for info in hits.values():
-            for c in info.get("categories", []):
-                per_cat[c] = per_cat.get(c, 0.0) + float(info.get("weight", 1.0))
-        return per_cat
+        mask, vec = self.summarize_vector(hits)
+        return {c: vec[i] for i, c in enumerate(self.cat_order) if mask >> i & 1}
+
+    def summarize_vector(self, hits: Dict[str, Dict]) -> Tuple[int, List[float]]:
+        """(mask, vec): vec[i] is the weight sum for cat_order[i]; bit i of mask is set
+        if that category was hit at all (the low bits line up with CAT_BIT)."""
+        vec = [0.0] * len(self.cat_order)
+        masks, idx = self._masks, self._cat_idx
+        mask = 0
+        for term, info in hits.items():
+            mask |= masks.get(term, 0)
+            w = float(info.get("weight", 1.0))
+            for i in idx.get(term, ()):
+                vec[i] += w
+        return mask, vec
 
     def has_always_flag(self, hits: Dict[str, Dict]) -> bool:
-        for info in hits.values():
-            if any(c in ALWAYS_FLAG_CATS for c in info.get("categories", [])):
-                return True
-        return False
+        masks = self._masks
+        return any(masks.get(term, 0) & ALWAYS_FLAG_MASK for term in hits)
+
+
+# Model locations (built via build_hurtlex_model); LEXICON_PATH overrides
+SEARCH = [
+    os.path.join("models","hurtlex_model.json"),
+    os.path.join(os.path.dirname(__file__), "..", "models", "hurtlex_model.json"),
+]
+_LEX: Optional[Lexicon] = None
+_LEX_LOCK = threading.Lock()
+
+def _reset_lock_after_fork() -> None:
+    global _LEX_LOCK
+    _LEX_LOCK = threading.Lock()  # a fork during a background load would inherit it held
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+def model_path() -> str:
+    """Path get_lex() loads: LEXICON_PATH, else the first SEARCH hit (FileNotFoundError if none)."""
+    env = os.getenv("LEXICON_PATH")
+    if env:
+        return env
+    for p in SEARCH:
+        if os.path.isfile(p):
+            return p
+    raise FileNotFoundError("models/hurtlex_model.json not found. Build it first.")
+
+def get_lex() -> Lexicon:
+    """The process-wide Lexicon, loaded once on first use (thread-safe)."""
+    global _LEX
+    if _LEX is None:
+        with _LEX_LOCK:
+            if _LEX is None:
+                _LEX = Lexicon(model_path())
+    return _LEX
+
+def reload_lex(path: Optional[str] = None) -> Lexicon:
+    """Replace this process's shared Lexicon, e.g. after rebuilding the model file."""
+    global _LEX
+    lex = Lexicon(path or model_path())
+    with _LEX_LOCK:
+        _LEX = lex
+    return lex
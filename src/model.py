@@ -2,22 +2,16 @@
 and returns toxicity-style labels. Fast, deterministic, 
 and privacy-first (no external services)."""
 
-from typing import Dict
-import os, re, math
+from typing import Dict, Iterable, List, Optional, Tuple
+import functools, re, math
 
-from .lexicon_model import Lexicon, ALWAYS_FLAG_CATS
+try:  # optional: RE2 is a DFA engine, linear-time on any input
+    import re2
+except ImportError:
+    re2 = None
 
-# Load the lexicon (built via build_hurtlex_model)
-SEARCH = [
-    os.path.join("models","hurtlex_model.json"),
-    os.path.join(os.path.dirname(__file__), "..", "models", "hurtlex_model.json"),
-]
-LEX = None
-for p in SEARCH:
-    if os.path.isfile(p):
-        LEX = Lexicon(p); break
-if LEX is None:
-    raise FileNotFoundError("models/hurtlex_model.json not found. Build it first.")
+from .lexicon_model import ALWAYS_FLAG_MASK, CAT_INDEX, cat_mask, get_lex, reload_lex
+from .labels import LABELS
 
 # Tight heuristics (avoid false positives)
 THREAT_PATTERNS = [
@@ -40,31 +34,144 @@ STEREO_FRAMES = [
     re.compile(r"\bevery\s+([a-z]{3,})\s+(is|are)\s+[a-z]{3,}", re.I),
 ]
 
+def _compile_scan(pattern: str):
+    r"""(ascii_scan, scan) for a case-insensitive pattern: scan is stdlib re, and
+    ascii_scan is RE2 when installed. Outside ASCII the engines disagree (re folds
+    "ı", "ſ", "K" onto ASCII letters, RE2 doesn't), so RE2 only ever sees ASCII text.
+    Its \s also lacks \v and \x1c-\x1f, which re counts as whitespace."""
+    rx = re.compile(pattern, re.I)
+    if re2 is not None:
+        try:
+            return re2.compile("(?i)" + pattern.replace(r"\s", r"[\s\x0b\x1c-\x1f]")), rx
+        except Exception:
+            pass  # construct RE2 can't handle; keep the backtracking engine
+    return rx, rx
+
+# Threat patterns only need "any hit", so they are scanned once as a single
+# alternation. Stereotype frames are scanned one by one: in an alternation a
+# match of one frame ("every day is all") can consume the text another frame
+# needed ("all women are lazy").
+THREAT_RE_ASCII, THREAT_RE = _compile_scan("|".join(f"(?:{rx.pattern})" for rx in THREAT_PATTERNS))
+STEREO_SCANS = [_compile_scan(rx.pattern) for rx in STEREO_FRAMES]
+
+# Literal pre-filters: every pattern above contains one of these words, and a
+# substring check is much cheaper than regex scans of text that can't match.
+# Only valid for lowercased ASCII (score() lowercases ASCII keys): Unicode re.I
+# also folds "ı", "ſ", "K", "İ" onto ASCII letters, so other text goes to the regex.
+THREAT_ANCHORS = ("kill", "hurt", "beat", "stab", "shoot", "dox", "swat")
+STEREO_ANCHORS = ("all", "every")
+
+def _threat_hit(text: str) -> bool:
+    if text.isascii():
+        if not any(a in text for a in THREAT_ANCHORS):
+            return False
+        return THREAT_RE_ASCII.search(text) is not None
+    return THREAT_RE.search(text) is not None
+
 def _stereo_hit(text: str) -> bool:
-    for rx in STEREO_FRAMES:
-        m = rx.search(text)
-        if m and (m.group(1) or "").lower() in IDENTITY_WORDS:
-            return True
+    is_ascii = text.isascii()
+    if is_ascii and not any(a in text for a in STEREO_ANCHORS):
+        return False
+    for ascii_rx, rx in STEREO_SCANS:
+        for m in (ascii_rx if is_ascii else rx).finditer(text):
+            if m.group(1).lower() in IDENTITY_WORDS:
+                return True
     return False
 
+# Fast path: most chat lines ("ok", "ty", emoji) can't hit anything. Every lexicon
+# token and heuristic needs an ASCII letter; "kill u" is the shortest heuristic hit.
+_ASCII_ALPHA = re.compile(r"[A-Za-z]")
+_SHORTEST_HEURISTIC = len("kill u")
+ZERO_SCORES = dict.fromkeys(LABELS, 0.0)
+
+def could_match(text: str) -> bool:
+    """Cheap pre-check; False means score(text) is all zeros."""
+    min_len = min(get_lex().min_term_len, _SHORTEST_HEURISTIC)
+    return len(text) >= min_len and _ASCII_ALPHA.search(text) is not None
+
 def _ramp(x: float, k: float=0.6) -> float:
     return 1.0 - math.exp(-k * max(0.0, x))
 
+# Chat traffic repeats itself ("lol", "ok", copypasta); scoring is deterministic,
+# so short messages are memoized. Longer ones bypass the cache to bound memory.
+# Entries are tuples in LABELS order (~100 bytes each, and immutable).
+CACHE_SIZE = 4096
+CACHE_MAX_LEN = 512
+
+def _key(text: str) -> str:
+    """Cache key / scan input. Lexicon and heuristics are case-insensitive already;
+    lowercasing only pays for sharing cache slots, and is exact only for ASCII
+    ("İ".lower() is "i" + U+0307, which no longer matches the re.I patterns)."""
+    t = (text or "").strip()
+    return t.lower() if t.isascii() else t
+
 def score(text: str) -> Dict[str, float]:
     """
     Return label scores in 0..1 (all zeros if nothing matched):
       - toxicity, severe_toxicity, insult, threat, obscene, identity_attack
     """
-    t = text or ""
+    t = _key(text)
+    if not could_match(t):
+        return dict(ZERO_SCORES)
+    if len(t) > CACHE_MAX_LEN:
+        return _score(t)
+    return dict(zip(LABELS, _score_cached(t)))
 
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _score_cached(t: str) -> Tuple[float, ...]:
+    sc = _score(t)
+    return tuple(sc[k] for k in LABELS)
+
+score.cache_clear = _score_cached.cache_clear
+
+def score_batch(texts: Iterable[str]) -> List[Dict[str, float]]:
+    """
+    score() for bulk work (backfills, reports). Duplicates within the batch are
+    scored once, and the shared LRU is bypassed so a backfill can't evict the
+    live-chat entries.
+    """
+    memo: Dict[str, Dict[str, float]] = {}
+    out = []
+    for text in texts:
+        t = _key(text)
+        sc = memo.get(t)
+        if sc is None:
+            sc = memo[t] = _score(t) if could_match(t) else ZERO_SCORES
+        out.append(dict(sc))
+    return out
+
+def reload_lexicon(path: Optional[str] = None) -> None:
+    """
+    Swap in a rebuilt lexicon and drop scores cached against the old one.
+    Affects the calling process only: worker processes (e.g. the bot's score
+    pool) keep their own lexicon and cache until they are restarted.
+    """
+    reload_lex(path)
+    score.cache_clear()
+
+# HurtLex categories feeding each label, as indices into the summarize_vector() vector
+_OBS = tuple(CAT_INDEX[c] for c in ("QAS","SVP","RE","DMC"))
+_INS = tuple(CAT_INDEX[c] for c in ("IS","OM","PR"))
+_IDN = tuple(CAT_INDEX[c] for c in ("ASM","ASF","CDS","RCI","OR","AN","IS"))
+IDENTITY_MASK = cat_mask(("ASM","ASF","CDS"))  # always-flag categories that also imply identity_attack
+
+def _sum(vec: List[float], idx: Tuple[int, ...]) -> float:
+    # plain loop over list slots: no genexpr frame, no string hashing
+    s = 0.0
+    for i in idx:
+        s += vec[i]
+    return s
+
+def _score(t: str) -> Dict[str, float]:
     # 1) Lexicon hits
-    hits = LEX.match(t)
-    per_cat = LEX.summarize(hits)
+    lex = get_lex()
+    hits = lex.match(t)
+    mask, vec = lex.summarize_vector(hits)
     any_hits = bool(hits)
 
     # 2) Heuristics
     threat = 0.0
-    if any(rx.search(t) for rx in THREAT_PATTERNS):
+    if _threat_hit(t):
         threat = 0.95
     identity = 0.0
     if _stereo_hit(t):
@@ -73,17 +180,17 @@ def score(text: str) -> Dict[str, float]:
     # 3) Category → label mapping (conservative)
     toxicity = obscene = insult = severe = 0.0
     if any_hits:
-        total_w = sum(per_cat.values())
+        total_w = sum(vec)
         base = _ramp(total_w)             # 0..1 proportional to number/weight of hits
         toxicity = max(toxicity, min(0.85, base))
-        obscene = max(obscene, _ramp(sum(per_cat.get(c,0.0) for c in ("QAS","SVP","RE","DMC"))))
-        insult  = max(insult,  _ramp(sum(per_cat.get(c,0.0) for c in ("IS","OM","PR"))))
-        identity = max(identity, _ramp(sum(per_cat.get(c,0.0) for c in ("ASM","ASF","CDS","RCI","OR","AN","IS"))))
+        obscene = max(obscene, _ramp(_sum(vec, _OBS)))
+        insult  = max(insult,  _ramp(_sum(vec, _INS)))
+        identity = max(identity, _ramp(_sum(vec, _IDN)))
 
     # 4) Always-flag categories: push high immediately
-    if any(c in ALWAYS_FLAG_CATS for c in per_cat.keys()):
+    if mask & ALWAYS_FLAG_MASK:
         toxicity = max(toxicity, 0.98)
-        if any(c in ("ASM","ASF","CDS") for c in per_cat.keys()):
+        if mask & IDENTITY_MASK:
             identity = max(identity, 0.90)
 
     # 5) Combine heuristics
@@ -12,12 +12,12 @@ WHY:
 import re
 URL_RE = re.compile(r"https?://\S+")
 MENTION_RE = re.compile(r"@\w+|<@!?[\d]+>")
-PUNCT_RE = re.compile(r"[\-_/\\.,;:!?*^~`'\[\](){}<>]+")
-WS_RE = re.compile(r"\s+")
+# gentle punctuation -> space as one C-level character map (was a regex pass)
+PUNCT_CHARS = "-_/\\.,;:!?*^~`'[](){}<>"
+_PUNCT_TABLE = str.maketrans(dict.fromkeys(PUNCT_CHARS, " "))
 def normalize_text(text: str) -> str:
     t = (text or "").lower()
     t = URL_RE.sub(" ", t)
     t = MENTION_RE.sub(" ", t)
-    t = PUNCT_RE.sub(" ", t)
-    t = WS_RE.sub(" ", t).strip()
-    return t
+    t = t.translate(_PUNCT_TABLE)
+    return " ".join(t.split())  # collapse + strip whitespace
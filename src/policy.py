@@ -2,11 +2,12 @@
 Simple JSON persistence so servers can tune behavior safely."""
 
 from typing import Dict
-from .storage import get_threshold
+from .storage import get_thresholds
 DEFAULTS={'toxicity':0.50,'severe_toxicity':0.40,'insult':0.45,'threat':0.35,'obscene':0.45,'identity_attack':0.35}
 def decide_action(guild_id:str, channel_id:str, scores:Dict[str,float]):
     over=False; details={}
+    overrides=get_thresholds(guild_id,channel_id)
     for k,v in scores.items():
-        thr=get_threshold(guild_id,channel_id,k) or DEFAULTS.get(k,0.5)
+        thr=overrides.get(k) or DEFAULTS.get(k,0.5)
         flag=v>=thr; details[k]={'score':v,'threshold':thr,'over':flag}; over=over or flag
     return over, details
@@ -1,19 +1,42 @@
 """Lightweight persistence for recent scores and CSV export. 
 Stores only aggregates/metrics—never full message content."""
 
-import os, sqlite3, json, time
-from typing import Dict
+import atexit, os, queue, sqlite3, json, threading, time
+from typing import Dict, Iterable, Tuple
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 os.makedirs(DB_PATH, exist_ok=True)
 DB_FILE = os.path.join(DB_PATH, "toxicity.db")
 
+# One long-lived connection per thread (event loop, executor workers), opened
+# lazily; PRAGMAs run once per connection instead of on every call.
+_tls = threading.local()
+
 def _conn():
-    con = sqlite3.connect(DB_FILE)
-    con.execute("PRAGMA journal_mode=WAL;")
-    con.execute("PRAGMA foreign_keys=ON;")
+    con = getattr(_tls, "con", None)
+    if con is None:
+        con = sqlite3.connect(DB_FILE)
+        con.execute("PRAGMA journal_mode=WAL;")
+        con.execute("PRAGMA foreign_keys=ON;")
+        con.execute("PRAGMA synchronous=NORMAL;")    # safe under WAL; no fsync per commit
+        con.execute("PRAGMA busy_timeout=5000;")     # wait out writer bursts instead of raising
+        con.execute("PRAGMA mmap_size=134217728;")   # 128 MB: reads straight from the page cache
+        con.execute("PRAGMA cache_size=-20000;")     # ~20 MB page cache
+        con.execute("PRAGMA temp_store=MEMORY;")
+        _tls.con = con
     return con
 
+@atexit.register
+def _close_conn():
+    """Close the calling thread's connection (sqlite3 only lets the owning thread do it).
+    Runs at exit for the main thread and on _STOP for the writer; executor threads'
+    connections close when those threads are collected."""
+    con = getattr(_tls, "con", None)
+    if con is not None:
+        _tls.con = None
+        try: con.close()
+        except sqlite3.Error: pass
+
 def _init():
     con=_conn(); cur=con.cursor()
     cur.execute("""
@@ -29,14 +52,72 @@ def _init():
         PRIMARY KEY (guild_id, channel_id, label)
     );
     """)
-    con.commit(); con.close()
+    con.commit(); cur.close()
 _init()
 
+# Write-behind for score rows: record_message only enqueues; one writer thread
+# commits up to WRITE_BATCH rows per transaction, at least every WRITE_FLUSH_MS.
+WRITE_BATCH = 128
+WRITE_FLUSH_MS = 250
+WRITE_QUEUE_MAX = 10_000
+_write_q: "queue.Queue" = queue.Queue(maxsize=WRITE_QUEUE_MAX)
+_STOP = object()
+_writer_thread: threading.Thread | None = None
+_writer_lock = threading.Lock()
+
+def _writer():
+    while True:
+        rows = []
+        item = _write_q.get()
+        deadline = time.monotonic() + WRITE_FLUSH_MS / 1000
+        while item is not _STOP:
+            rows.append(item)
+            timeout = deadline - time.monotonic()
+            if len(rows) >= WRITE_BATCH or timeout <= 0:
+                break
+            try: item = _write_q.get(timeout=timeout)
+            except queue.Empty: break
+        if rows:
+            try: record_messages_batch(rows)
+            except Exception as e: print("Record write error:", e)
+        if item is _STOP:
+            _close_conn()
+            return
+
+def _ensure_writer():
+    global _writer_thread
+    if _writer_thread is None:
+        with _writer_lock:
+            if _writer_thread is None:
+                _writer_thread = threading.Thread(target=_writer, name="storage-writer", daemon=True)
+                _writer_thread.start()
+
 def record_message(mid, uid, cid, gid, scores: Dict[str,float], triggered:int):
+    """Queue one score row (non-blocking); the writer thread commits it shortly."""
+    _ensure_writer()
+    try:
+        _write_q.put_nowait((mid, uid, cid, gid, scores, triggered, int(time.time())))
+    except queue.Full:
+        pass  # metrics only; under a backlog drop the row rather than block the caller
+
+def flush_writes(timeout: float = 5.0):
+    """Commit everything queued so far and stop the writer (runs at exit)."""
+    global _writer_thread
+    with _writer_lock:
+        t, _writer_thread = _writer_thread, None
+    if t is not None:
+        _write_q.put(_STOP, timeout=timeout)
+        t.join(timeout)
+
+def record_messages_batch(rows: Iterable[Tuple]):
+    """rows of (mid, uid, cid, gid, scores, triggered, created_at), written in one transaction."""
     con=_conn()
-    con.execute("INSERT OR REPLACE INTO messages VALUES(?,?,?,?,?,?,?)",
-                (mid, uid, cid, gid, int(time.time()), json.dumps(scores), int(triggered)))
-    con.commit(); con.close()
+    with con:
+        con.executemany("INSERT OR REPLACE INTO messages VALUES(?,?,?,?,?,?,?)",
+                        [(mid, uid, cid, gid, int(ts), json.dumps(scores), int(triggered))
+                         for (mid, uid, cid, gid, scores, triggered, ts) in rows])
+
+atexit.register(flush_writes)  # after _close_conn's registration, so it runs first
 
 def fetch_recent_user_scores(uid: str, gid: str, days: int = 7):
     cutoff = int(time.time()) - days*86400
@@ -44,22 +125,53 @@ def fetch_recent_user_scores(uid: str, gid: str, days: int = 7):
     cur.execute("SELECT created_at, scores_json FROM messages WHERE user_id=? AND guild_id=? AND created_at>=? ORDER BY created_at ASC",
                 (uid, gid, cutoff))
     rows = [(int(ts), json.loads(js)) for (ts, js) in cur.fetchall()]
-    con.close(); return rows
+    cur.close(); return rows
 
-def purge_older_than(days:int=30):
+def purge_older_than(days:int=30, chunk_size:int|None=None):
+    """Delete rows older than `days`; with chunk_size, in short transactions of that many rows."""
     cutoff = int(time.time()) - days*86400
-    con=_conn(); con.execute("DELETE FROM messages WHERE created_at < ?", (cutoff,))
-    con.commit(); con.close()
+    con=_conn()
+    if not chunk_size:
+        con.execute("DELETE FROM messages WHERE created_at < ?", (cutoff,))
+        con.commit()
+    else:
+        while True:
+            cur = con.execute("DELETE FROM messages WHERE rowid IN "
+                              "(SELECT rowid FROM messages WHERE created_at < ? LIMIT ?)", (cutoff, chunk_size))
+            con.commit()
+            if cur.rowcount < chunk_size:
+                break
+
+# Policies are read on every message and written almost never: cache each
+# channel's overrides, invalidated by upsert_policy. The lock keeps a miss that
+# races an upsert from caching the old rows.
+_THR_CACHE: Dict[Tuple[str,str], Dict[str,float]] = {}
+_thr_lock = threading.Lock()
 
 def upsert_policy(gid:str, cid:str, label:str, thr:float):
     con=_conn()
-    con.execute("INSERT INTO policies VALUES(?,?,?,?) ON CONFLICT(guild_id,channel_id,label) DO UPDATE SET threshold=excluded.threshold",
-                (gid,cid,label,thr))
-    con.commit(); con.close()
+    with _thr_lock:
+        con.execute("INSERT INTO policies VALUES(?,?,?,?) ON CONFLICT(guild_id,channel_id,label) DO UPDATE SET threshold=excluded.threshold",
+                    (gid,cid,label,thr))
+        con.commit()
+        _THR_CACHE.pop((gid,cid), None)
+
+def thresholds_cached(gid:str, cid:str) -> bool:
+    """True if get_thresholds(gid, cid) will be answered from memory."""
+    return (gid,cid) in _THR_CACHE
 
 def get_threshold(gid:str, cid:str, label:str):
-    con=_conn(); cur=con.cursor()
-    cur.execute("SELECT threshold FROM policies WHERE guild_id=? AND channel_id=? AND label=?",
-                (gid,cid,label))
-    row=cur.fetchone(); con.close()
-    return float(row[0]) if row else None
+    return get_thresholds(gid, cid).get(label)
+
+def get_thresholds(gid:str, cid:str) -> Dict[str,float]:
+    """Every override for one channel as {label: threshold}; one query per cache miss."""
+    cached = _THR_CACHE.get((gid,cid))
+    if cached is None:
+        with _thr_lock:
+            cached = _THR_CACHE.get((gid,cid))
+            if cached is None:
+                con=_conn(); cur=con.cursor()
+                cur.execute("SELECT label, threshold FROM policies WHERE guild_id=? AND channel_id=?", (gid,cid))
+                cached = _THR_CACHE[(gid,cid)] = {label: float(thr) for label, thr in cur.fetchall()}
+                cur.close()
+    return dict(cached)
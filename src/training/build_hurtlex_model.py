@@ -5,15 +5,18 @@ Works with .tsv / .csv / .tsv.gz / .csv.gz, header or no header.
 Usage:
   python -m src.training.build_hurtlex_model --tsv /path/to/hurtlex_EN.tsv[.gz] [--force]
 """
-import os, json, argparse, re, csv, gzip, io, sys
+import os, json, argparse, re, csv, gzip, itertools, sys
 from collections import Counter
 
-KNOWN = {"PS","RCI","PA","DDF","DDP","DMC","IS","OR","AN","ASM","ASF","PR","OM","QAS","CDS","RE","SVP"}
+from ..lexicon_model import CATEGORIES, build_automaton, phrase_tokens
+
+KNOWN = set(CATEGORIES)
 UPPER_CODE = re.compile(r"\b([A-Z]{2,3})\b")
+_SEP = str.maketrans(",;/", "   ")  # category separators -> whitespace for str.split
 
 def _open_any(path: str):
     if path.endswith(".gz"):
-        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", errors="ignore")
+        return gzip.open(path, "rt", encoding="utf-8", errors="ignore")
     return open(path, "r", encoding="utf-8", errors="ignore")
 
 def _sniff(sample: str) -> str:
@@ -25,47 +28,48 @@ def _sniff(sample: str) -> str:
         return ";"
 
 def read_lemma_file(path: str):
+    terms = {}
     with _open_any(path) as f:
         sample = f.read(4096)
         f.seek(0)
         delim = _sniff(sample)
-        rdr = csv.reader(f, delimiter=delim)
-        rows = [r for r in rdr if any((c or "").strip() for c in r)]
-
-    header = [c.strip().lower() for c in rows[0]] if rows else []
-    has_header = any(x in header for x in ("lemma","lexeme","category","categories","pos","stereotype","id"))
-    if has_header:
-        rows = rows[1:]
-
-    lemma_idx = None
-    cats_idx = None
-    for i, name in enumerate(header):
-        if name in ("lemma","lexeme"): lemma_idx = i
-        if name in ("category","categories"): cats_idx = i
-
-    terms = {}
-    for r in rows:
-        # lemma
-        if lemma_idx is not None and lemma_idx < len(r) and (r[lemma_idx] or "").strip():
-            lemma = r[lemma_idx].strip().lower()
-        else:
-            toks = [c for c in r if re.search(r"[A-Za-z]", c or "")]
-            if not toks: continue
-            lemma = toks[0].strip().lower()
-
-        # categories
-        cats = set()
-        if cats_idx is not None and cats_idx < len(r):
-            for tok in re.split(r"[\s,;/]+", (r[cats_idx] or "").strip()):
-                tok = (tok or "").strip().upper()
-                if tok in KNOWN: cats.add(tok)
-
-        if not cats:
-            line = " ".join([c or "" for c in r])
-            cats |= set(m.group(1) for m in UPPER_CODE.finditer(line) if m.group(1) in KNOWN)
-
-        if lemma and cats:
-            terms.setdefault(lemma, set()).update(cats)
+        # stream rows: the file is never held in memory as a list
+        rows = (r for r in csv.reader(f, delimiter=delim) if any((c or "").strip() for c in r))
+        first = next(rows, None)
+
+        header = [c.strip().lower() for c in first] if first else []
+        has_header = any(x in header for x in ("lemma","lexeme","category","categories","pos","stereotype","id"))
+        if first is not None and not has_header:
+            rows = itertools.chain((first,), rows)
+
+        lemma_idx = None
+        cats_idx = None
+        for i, name in enumerate(header):
+            if name in ("lemma","lexeme"): lemma_idx = i
+            if name in ("category","categories"): cats_idx = i
+
+        for r in rows:
+            # lemma
+            if lemma_idx is not None and lemma_idx < len(r) and (r[lemma_idx] or "").strip():
+                lemma = r[lemma_idx].strip().lower()
+            else:
+                toks = [c for c in r if re.search(r"[A-Za-z]", c or "")]
+                if not toks: continue
+                lemma = toks[0].strip().lower()
+
+            # categories
+            cats = set()
+            if cats_idx is not None and cats_idx < len(r):
+                for tok in (r[cats_idx] or "").translate(_SEP).split():
+                    tok = tok.upper()
+                    if tok in KNOWN: cats.add(tok)
+
+            if not cats:
+                line = " ".join([c or "" for c in r])
+                cats |= set(m.group(1) for m in UPPER_CODE.finditer(line) if m.group(1) in KNOWN)
+
+            if lemma and cats:
+                terms.setdefault(lemma, set()).update(cats)
 
     return {k: sorted(v) for k, v in terms.items() if v}
 
@@ -78,7 +82,17 @@ def build_model(term2cats):
         if any(c in {"PS","DDP","DDF","CDS"} for c in cats): w += 1.5
         if " " in term or "-" in term: w += 0.5
         weights[term] = w
-    return {"kind":"hurtlex-lexicon","version":3,"weights":weights,"categories":term2cats}
+
+    # v4: ship the phrase automaton so the bot doesn't rebuild it on every start
+    phrase_map = {}
+    for term in weights:
+        if " " in term or "-" in term:
+            toks = phrase_tokens(term)
+            if toks:
+                phrase_map.setdefault(toks, []).append(term)
+    goto, fail, out = build_automaton(phrase_map)
+    return {"kind":"hurtlex-lexicon","version":4,"weights":weights,"categories":term2cats,
+            "automaton":{"goto":goto,"fail":fail,"out":out}}
 
 def main():
     ap = argparse.ArgumentParser()
@@ -1,10 +1,16 @@
-import csv, io, datetime as dt
+import csv, io, time
+from .labels import LABELS
+
+_ZEROS = (0.0,) * len(LABELS)  # per-label default for missing scores
 
 def csv_export(rows):
-    buf=io.StringIO(); w=csv.writer(buf)
-    w.writerow(["timestamp_iso","toxicity","severe_toxicity","insult","threat","obscene","identity_attack"])
-    for ts, sc in rows:
-        iso=dt.datetime.utcfromtimestamp(ts).isoformat()+"Z"
-        w.writerow([iso, sc.get("toxicity",0.0), sc.get("severe_toxicity",0.0), sc.get("insult",0.0),
-                    sc.get("threat",0.0), sc.get("obscene",0.0), sc.get("identity_attack",0.0)])
-    return buf.getvalue().encode()
+    # write through a UTF-8 wrapper straight into bytes: one buffer, no final .encode()
+    buf=io.BytesIO()
+    out=io.TextIOWrapper(buf, encoding="utf-8", newline="", write_through=True)
+    w=csv.writer(out)
+    w.writerow(["timestamp_iso", *LABELS])
+    # one writerows call drives the loop from C; map(sc.get, LABELS, zeros) does the lookups
+    w.writerows((time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)), *map(sc.get, LABELS, _ZEROS))
+                for ts, sc in rows)
+    out.flush(); out.detach()  # detach so the wrapper can't close buf
+    return buf.getvalue()
@@ -0,0 +1,42 @@
+import json, os, tempfile, unittest
+
+from src.lexicon_model import Lexicon, build_automaton
+from src.training.build_hurtlex_model import build_model
+
+TERMS = {
+    "idiot": ["IS"],
+    "gag reel": ["DMC"],
+    "dumb head": ["OM"],
+    "bad guy": ["ASM"],
+}
+
+
+class StoredAutomatonTest(unittest.TestCase):
+    def _load(self, model):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(model, f)
+        self.addCleanup(os.remove, path)
+        return Lexicon(path)
+
+    def test_v4_uses_stored_tables(self):
+        model = build_model(dict(TERMS))
+        lex = self._load(model)
+        self.assertTrue(lex._automaton_fits(model["automaton"]))
+        self.assertEqual(set(lex.match("what a dumb head, bad guy")), {"dumb head", "bad guy"})
+
+    def test_edited_v4_still_matches(self):
+        model = build_model(dict(TERMS))
+        # phrase removed after the build: must not KeyError
+        del model["weights"]["gag reel"], model["categories"]["gag reel"]
+        # phrase added after the build: must still be found
+        model["weights"]["total jerk"] = 1.0
+        model["categories"]["total jerk"] = ["IS"]
+        lex = self._load(model)
+        self.assertEqual(lex.match("well gag reel indeed"), {})
+        self.assertEqual(set(lex.match("such a total jerk")), {"total jerk"})
+        self.assertEqual((lex._goto, lex._fail, lex._out), build_automaton(lex.phrase_map))
+
+
+if __name__ == "__main__":
+    unittest.main()